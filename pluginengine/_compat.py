@@ -6,9 +6,8 @@
 
 import sys
 
-if sys.version_info[0] > 2:
-    def iteritems(arg, **kwargs):
-        return iter(arg.items(**kwargs))
+if sys.version_info >= (3, 10):
+    from importlib.metadata import EntryPoint, entry_points, version
 else:
-    def iteritems(arg, **kwargs):
-        return iter(arg.iteritems(**kwargs))
+    # `entry_points(group=...)` is only available in the stdlib since 3.10
+    from importlib_metadata import EntryPoint, entry_points, version
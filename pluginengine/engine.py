@@ -5,10 +5,12 @@
 # and/or modify it under the terms of the Revised BSD License.
 
 from __future__ import unicode_literals
-from pkg_resources import iter_entry_points, get_distribution
+from collections import defaultdict
+from functools import lru_cache
 
 from werkzeug.datastructures import ImmutableDict
 
+from ._compat import entry_points, version
 from .plugin import Plugin
 from .signals import plugins_loaded
 from .util import resolve_dependencies, get_root_path
@@ -20,13 +22,29 @@ class PluginEngine(object):
 
     def __init__(self, namespace, logger=None):
         self._state = _PluginEngineState(self, logger)
-        self.plugins_to_load = []
+        self._plugins_to_load = ()
         self.plugins_namespace = namespace
 
     @property
     def state(self):
         return self._state
 
+    @property
+    def plugins_to_load(self):
+        """The names of the plugins to load.
+
+        Duplicate names are removed when setting this; the order of the
+        first occurrence of each name is kept.  The value is a read-only
+        tuple: assign a new sequence instead of mutating it in place
+        (e.g. ``engine.plugins_to_load += ('name',)`` rather than
+        ``engine.plugins_to_load.append('name')``).
+        """
+        return self._plugins_to_load
+
+    @plugins_to_load.setter
+    def plugins_to_load(self, value):
+        self._plugins_to_load = tuple(dict.fromkeys(value))
+
     def load_plugins(self, skip_failed=True):
         """Loads all plugins for an application.
 
@@ -39,51 +57,61 @@ class PluginEngine(object):
         if state.plugins_loaded:
             raise RuntimeError('Plugins already loaded')
         state.plugins_loaded = True
-        plugins = self._import_plugins()
+        plugins = self._import_plugins(skip_failed)
         if state.failed and not skip_failed:
             return False
         for name, cls in resolve_dependencies(plugins):
             instance = cls(self)
-            state.plugins[name] = instance
+            state.set_plugin(name, instance)
         plugins_loaded.send()
         return not state.failed
 
-    def _import_plugins(self):
+    def _import_plugins(self, skip_failed=True):
         """Imports the plugins for an application.
 
         :param app: A Flask application
+        :param skip_failed: If False, stop importing plugins as soon as
+          one plugin could not be loaded.
         :return: A dict mapping plugin names to plugin classes
         """
         state = self.state
+        logger = state.logger
+        add_failed = state.add_failed
+        base_class = self.plugin_class
         plugins = {}
+        all_entry_points = defaultdict(list)
+        for entry_point in entry_points(group=self.plugins_namespace):
+            all_entry_points[entry_point.name].append(entry_point)
         for name in self.plugins_to_load:
-            entry_points = list(iter_entry_points(self.plugins_namespace, name))
-            if not entry_points:
-                state.logger.error('Plugin {} does not exist'.format(name))
-                state.failed.add(name)
+            if state.failed and not skip_failed:
+                break
+            plugin_entry_points = all_entry_points.get(name, [])
+            if not plugin_entry_points:
+                logger.error('Plugin {} does not exist'.format(name))
+                add_failed(name)
                 continue
-            elif len(entry_points) > 1:
-                state.logger.error('Plugin name {} is not unique (defined in {})'
-                                   .format(name, ', '.join(ep.module_name for ep in entry_points)))
-                state.failed.add(name)
+            elif len(plugin_entry_points) > 1:
+                logger.error('Plugin name {} is not unique (defined in {})'
+                             .format(name, ', '.join(ep.module for ep in plugin_entry_points)))
+                add_failed(name)
                 continue
-            entry_point = entry_points[0]
+            entry_point = plugin_entry_points[0]
             try:
                 plugin_class = entry_point.load()
             except ImportError:
-                state.logger.exception('Could not load plugin {}'.format(name))
-                state.failed.add(name)
+                logger.exception('Could not load plugin {}'.format(name))
+                add_failed(name)
                 continue
-            if not issubclass(plugin_class, self.plugin_class):
-                state.logger.error('Plugin {} does not inherit from {}'.format(name, self.plugin_class.__name__))
-                state.failed.add(name)
+            if not issubclass(plugin_class, base_class):
+                logger.error('Plugin {} does not inherit from {}'.format(name, base_class.__name__))
+                add_failed(name)
                 continue
-            plugin_class.package_name = entry_point.module_name.split('.')[0]
-            plugin_class.package_version = get_distribution(plugin_class.package_name).version
+            plugin_class.package_name = entry_point.module.split('.')[0]
+            plugin_class.package_version = _get_package_version(plugin_class.package_name)
             if plugin_class.version is None:
                 plugin_class.version = plugin_class.package_version
             plugin_class.name = name
-            plugin_class.root_path = get_root_path(entry_point.module_name)
+            plugin_class.root_path = get_root_path(entry_point.module)
             plugins[name] = plugin_class
         return plugins
 
@@ -91,8 +119,10 @@ class PluginEngine(object):
         """Returns the list of plugins which could not be loaded.
 
         :param app: A Flask app. Defaults to the current app.
+        :return: read-only set-like view of the plugin names, in the
+          order in which they failed
         """
-        return frozenset(self.state.failed)
+        return self.state.failed_view
 
     def get_active_plugins(self):
         """Returns the currently active plugins.
@@ -100,7 +130,7 @@ class PluginEngine(object):
         :param app: A Flask app. Defaults to the current app.
         :return: dict mapping plugin names to plugin instances
         """
-        return ImmutableDict(self.state.plugins)
+        return self.state.active_view()
 
     def has_plugin(self, name):
         """Returns if a plugin is loaded in the current app.
@@ -122,6 +152,11 @@ class PluginEngine(object):
         return '<PluginEngine()>'
 
 
+@lru_cache(maxsize=None)
+def _get_package_version(package_name):
+    return version(package_name)
+
+
 class _PluginEngineState(object):
     def __init__(self, plugin_engine, logger=None):
         if logger is None:
@@ -129,8 +164,24 @@ class _PluginEngineState(object):
         self.plugin_engine = plugin_engine
         self.logger = logger
         self.plugins = {}
-        self.failed = set()
+        # Used as an insertion-ordered set
+        self.failed = {}
+        self.failed_view = self.failed.keys()
         self.plugins_loaded = False
+        # Immutable snapshot of `plugins`, reset on every change
+        self._active_immutable = None
+
+    def add_failed(self, name):
+        self.failed[name] = None
+
+    def set_plugin(self, name, instance):
+        self.plugins[name] = instance
+        self._active_immutable = None
+
+    def active_view(self):
+        if self._active_immutable is None:
+            self._active_immutable = ImmutableDict(self.plugins)
+        return self._active_immutable
 
     def __repr__(self):
         return '<_PluginEngineState({}, {})>'.format(self.plugin_engine, self.plugins)
@@ -1,8 +1,14 @@
 from __future__ import absolute_import
 import logging
 
+_configured = False
+
 
 def create_logger(logername):
-    logger = logging.getLogger(logername)
-    logging.basicConfig()
-    return logger
+    global _configured
+    if not _configured:
+        # basicConfig is a no-op once the root logger has handlers, but it
+        # still takes the logging lock, so only call it the first time
+        logging.basicConfig()
+        _configured = True
+    return logging.getLogger(logername)
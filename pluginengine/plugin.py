@@ -5,7 +5,6 @@
 # and/or modify it under the terms of the Revised BSD License.
 
 from __future__ import unicode_literals
-from contextlib import contextmanager
 
 from .globals import _plugin_ctx_stack, current_plugin
 from .util import wrap_in_plugin_context, trim_docstring
@@ -49,6 +48,26 @@ def uses(*plugins):
     return wrapper
 
 
+class _PluginContext(object):
+    """Context manager used by :meth:`Plugin.plugin_context`.
+
+    A plain class is cheaper than a generator-based context manager, which
+    matters since it is entered whenever a plugin's signal receiver runs.
+    """
+
+    __slots__ = ('plugin',)
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+
+    def __enter__(self):
+        _plugin_ctx_stack.push(self.plugin)
+        return self.plugin
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        assert _plugin_ctx_stack.pop() is self.plugin, 'Popped wrong plugin'
+
+
 class Plugin(object):
     package_name = None  # set to the containing package when the plugin is loaded
     package_version = None  # set to the version of the containing package when the plugin is loaded
@@ -71,31 +90,47 @@ class Plugin(object):
         """
         pass
 
+    @classmethod
+    def _get_doc_parts(cls):
+        """Returns the title and description from the docstring."""
+        # Looked up in the class' own __dict__ so subclasses never use the
+        # cached docstring of their parent class
+        try:
+            return cls.__dict__['_doc_parts']
+        except KeyError:
+            parts = trim_docstring(cls.__doc__).split('\n', 1)
+            cls._doc_parts = (parts[0].strip(),
+                              parts[1].strip() if len(parts) > 1 else 'no description available')
+            return cls._doc_parts
+
     @property
     def title(self):
-        parts = trim_docstring(self.__doc__).split('\n', 1)
-        return parts[0].strip()
+        return self._get_doc_parts()[0]
 
     @property
     def description(self):
-        parts = trim_docstring(self.__doc__).split('\n', 1)
-        try:
-            return parts[1].strip()
-        except IndexError:
-            return 'no description available'
+        return self._get_doc_parts()[1]
 
-    @contextmanager
     def plugin_context(self):
         """Pushes the plugin on the plugin context stack."""
-        _plugin_ctx_stack.push(self)
-        try:
-            yield
-        finally:
-            assert _plugin_ctx_stack.pop() is self, 'Popped wrong plugin'
+        return _PluginContext(self)
 
     def connect(self, signal, receiver, **connect_kwargs):
-        connect_kwargs['weak'] = False
-        signal.connect(wrap_in_plugin_context(self, receiver), **connect_kwargs)
+        self.connect_many([(signal, receiver, connect_kwargs)])
+
+    def connect_many(self, receivers):
+        """Connects multiple signal receivers.
+
+        Each receiver is wrapped to run in the plugin context; a function
+        connected to several signals shares the same wrapper.
+
+        :param receivers: iterable of ``(signal, receiver, connect_kwargs)``
+                          tuples
+        """
+        wrap = wrap_in_plugin_context
+        for signal, receiver, connect_kwargs in receivers:
+            connect_kwargs = dict(connect_kwargs, weak=False)
+            signal.connect(wrap(self, receiver), **connect_kwargs)
 
     def __repr__(self):
         return '<{}({}) bound to {}>'.format(type(self).__name__, self.name, self.app)
@@ -7,11 +7,10 @@
 from __future__ import unicode_literals
 
 import os
-import pkgutil
 import sys
+from collections import defaultdict, deque
 from functools import wraps
-
-from ._compat import iteritems
+from importlib.util import find_spec
 
 
 def get_state(app):
@@ -32,55 +31,71 @@ def resolve_dependencies(plugins):
 
     :param plugins: dict mapping plugin names to plugin classes
     """
-    plugins_deps = {name: (cls.required_plugins, cls.used_plugins) for name, cls in iteritems(plugins)}
-    resolved_deps = set()
-    while plugins_deps:
-        # Get plugins with both hard and soft dependencies being met
-        ready = {cls for cls, deps in iteritems(plugins_deps) if all(d <= resolved_deps for d in deps)}
+    names = frozenset(plugins)
+    # Soft dependencies on plugins which are not available are ignored
+    used_plugins = {name: cls.used_plugins & names for name, cls in plugins.items()}
+    if not any(cls.required_plugins or used_plugins[name] for name, cls in plugins.items()):
+        # Nothing to sort
+        for name, cls in plugins.items():
+            yield name, cls
+        return
+    hard_deps = {}
+    soft_deps = {}
+    dependents = defaultdict(list)
+    soft_dependents = defaultdict(list)
+    for name, cls in plugins.items():
+        # Hard dependencies on plugins which are not available are never
+        # met, so they are counted but can never be decremented
+        hard_deps[name] = len(cls.required_plugins)
+        soft_deps[name] = len(used_plugins[name])
+        for dep in cls.required_plugins & names:
+            dependents[dep].append(name)
+        for dep in used_plugins[name]:
+            soft_dependents[dep].append(name)
+    # Plugins with both hard and soft dependencies being met
+    ready = deque(name for name in plugins if not hard_deps[name] and not soft_deps[name])
+    pending = set(plugins)
+    while pending:
         if not ready:
             # Otherwise check for plugins with all hard dependencies being met
-            ready = {cls for cls, deps in iteritems(plugins_deps) if deps[0] <= resolved_deps}
+            ready.extend(name for name in pending if not hard_deps[name])
         if not ready:
             # Either a circular dependency or a dependency that's not loaded
             raise Exception('Could not resolve dependencies between plugins')
-        resolved_deps |= ready
-        for name in ready:
-            yield name, plugins[name]
-            del plugins_deps[name]
-
-
-def make_hashable(obj):
-    """Makes an object containing dicts and lists hashable."""
-    if isinstance(obj, list):
-        return tuple(obj)
-    elif isinstance(obj, dict):
-        return frozenset((k, make_hashable(v)) for k, v in iteritems(obj))
-    return obj
-
-
-# http://wiki.python.org/moin/PythonDecoratorLibrary#Alternate_memoize_as_nested_functions
-def memoize(obj):
-    cache = {}
+        name = ready.popleft()
+        if name not in pending:
+            # Already resolved through the hard-dependencies-only fallback
+            continue
+        pending.remove(name)
+        yield name, plugins[name]
+        for dependent in dependents[name]:
+            hard_deps[dependent] -= 1
+            if not hard_deps[dependent] and not soft_deps[dependent]:
+                ready.append(dependent)
+        for dependent in soft_dependents[name]:
+            soft_deps[dependent] -= 1
+            if not hard_deps[dependent] and not soft_deps[dependent]:
+                ready.append(dependent)
+
+
+# Maps ``(plugin, func)`` to the wrapped function
+_plugin_ctx_wrappers = {}
 
-    @wraps(obj)
-    def memoizer(*args, **kwargs):
-        key = (make_hashable(args), make_hashable(kwargs))
-        if key not in cache:
-            cache[key] = obj(*args, **kwargs)
-        return cache[key]
 
-    return memoizer
-
-
-@memoize
 def wrap_in_plugin_context(plugin, func):
     assert plugin is not None
+    key = (plugin, func)
+    try:
+        return _plugin_ctx_wrappers[key]
+    except KeyError:
+        pass
 
     @wraps(func)
     def wrapped(*args, **kwargs):
         with plugin.plugin_context():
             return func(*args, **kwargs)
 
+    _plugin_ctx_wrappers[key] = wrapped
     return wrapped
 
 
@@ -104,25 +119,27 @@ def trim_docstring(docstring):
         return ''
     # Convert tabs to spaces (following the normal Python rules)
     # and split into a list of lines:
-    lines = docstring.expandtabs().splitlines()
+    first, *rest = docstring.expandtabs().splitlines()
     # Determine minimum indentation (first line doesn't count):
-    indent = sys.maxsize
-    for line in lines[1:]:
-        stripped = line.lstrip()
-        if stripped:
-            indent = min(indent, len(line) - len(stripped))
+    indent = min((len(line) - len(line.lstrip()) for line in rest if line.strip()), default=None)
     # Remove indentation (first line is special):
-    trimmed = [lines[0].strip()]
-    if indent < sys.maxsize:
-        for line in lines[1:]:
-            trimmed.append(line[indent:].rstrip())
+    trimmed = [first.strip()]
+    if indent is not None:
+        trimmed.extend(line[indent:].rstrip() for line in rest)
     # Strip off trailing and leading blank lines:
-    while trimmed and not trimmed[-1]:
-        trimmed.pop()
-    while trimmed and not trimmed[0]:
-        trimmed.pop(0)
+    start, end = 0, len(trimmed)
+    while start < end and not trimmed[start]:
+        start += 1
+    while end > start and not trimmed[end - 1]:
+        end -= 1
     # Return a single string:
-    return '\n'.join(trimmed)
+    return '\n'.join(trimmed[start:end])
+
+
+# Maps import names to their root path; only paths of modules which have
+# a location on disk are cached since modules do not move while the
+# process runs
+_root_paths = {}
 
 
 def get_root_path(import_name):
@@ -131,28 +148,41 @@ def get_root_path(import_name):
 
     From: https://github.com/mitsuhiko/flask/blob/master/flask/helpers.py
     """
-    # Module already imported and has a file attribute.  Use that first.
-    mod = sys.modules.get(import_name)
-    if mod is not None and hasattr(mod, '__file__'):
-        return os.path.dirname(os.path.abspath(mod.__file__))
+    try:
+        return _root_paths[import_name]
+    except KeyError:
+        pass
+    path = _get_module_root_path(import_name)
+    if path is None:
+        # The module may become importable and the current working
+        # directory may change, so the fallback is never cached
+        return os.getcwd()
+    _root_paths[import_name] = path
+    return path
 
-    # Next attempt: check the loader.
-    loader = pkgutil.get_loader(import_name)
 
-    # Loader does not exist or we're referring to an unloaded main module
-    # or a main module without path (interactive sessions), go with the
-    # current working directory.
-    if loader is None or import_name == '__main__':
-        return os.getcwd()
+def _get_module_root_path(import_name):
+    """Returns the path of a package or the folder that contains a module.
 
-    # For .egg, zipimporter does not have get_filename until Python 2.7.
-    # Some other loaders might exhibit the same behavior.
-    if hasattr(loader, 'get_filename'):
-        filepath = loader.get_filename(import_name)
-    else:
-        # Fall back to imports.
-        __import__(import_name)
-        filepath = sys.modules[import_name].__file__
-
-    # filepath is import_name.py for a module, or __init__.py for a package.
-    return os.path.dirname(os.path.abspath(filepath))
+    Returns None if the module cannot be found or has no location on disk.
+    """
+    # Module already imported and has a file attribute.  Use that first.
+    filepath = getattr(sys.modules.get(import_name), '__file__', None)
+    if filepath:
+        return os.path.dirname(os.path.abspath(filepath))
+
+    # Loader does not exist or we're referring to an unloaded main module
+    # or a main module without path (interactive sessions).
+    if import_name == '__main__':
+        return None
+    spec = find_spec(import_name)
+    if spec is None:
+        return None
+
+    # Packages (including namespace packages) are the folder itself.
+    if spec.submodule_search_locations:
+        return os.path.abspath(next(iter(spec.submodule_search_locations)))
+    # Modules without a file (e.g. built-in modules) have no folder.
+    if not spec.has_location:
+        return None
+    return os.path.dirname(os.path.abspath(spec.origin))
@@ -39,15 +39,16 @@ setup(
     zip_safe=False,
     include_package_data=True,
     platforms='any',
+    python_requires='>=3.7',
     install_requires=[
-        'blinker'
+        'blinker',
+        'importlib_metadata>=3.6; python_version < "3.10"'
     ],
     tests_require=['pytest'],
     cmdclass={'test': PyTest},
     classifiers=[
         'License :: OSI Approved :: BSD License',
-        'Programming Language :: Python :: 2.7',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4'
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only'
     ],
 )
@@ -4,12 +4,12 @@
 # Flask-PluginEngine is free software; you can redistribute it
 # and/or modify it under the terms of the Revised BSD License.
 
-from pkg_resources import EntryPoint, Distribution
-
 import pytest
+from blinker import Namespace
 from pytest import raises
 
-from pluginengine import PluginEngine, plugins_loaded, Plugin
+from pluginengine import PluginEngine, plugins_loaded, Plugin, current_plugin
+from pluginengine._compat import EntryPoint
 
 
 class EspressoModule(Plugin):
@@ -61,21 +61,22 @@ def engine():
 def mock_entry_point(monkeypatch):
     from pluginengine import engine as engine_mod
 
-    def _mock_entry_points(_, name):
-        return {
-            'espresso': [MockEntryPoint('espresso', 'test.plugin')],
-            'otherversion': [MockEntryPoint('otherversion', 'test.plugin')],
-            'someotherstuff': [],
-            'doubletrouble': [MockEntryPoint('double', 'double'), MockEntryPoint('double', 'double')],
-            'importfail': [MockEntryPoint('importfail', 'test.importfail')],
-            'imposter': [MockEntryPoint('imposter', 'test.imposter')]
-        }[name]
+    def _mock_entry_points(group):
+        return [
+            MockEntryPoint('espresso', 'test.plugin', group),
+            MockEntryPoint('otherversion', 'test.plugin', group),
+            MockEntryPoint('doubletrouble', 'double', group),
+            MockEntryPoint('doubletrouble', 'double', group),
+            MockEntryPoint('importfail', 'test.importfail', group),
+            MockEntryPoint('imposter', 'test.imposter', group)
+        ]
 
-    def _mock_distribution(name):
-        return Distribution(version='1.2.3')
+    def _mock_version(name):
+        return '1.2.3'
 
-    monkeypatch.setattr(engine_mod, 'iter_entry_points', _mock_entry_points)
-    monkeypatch.setattr(engine_mod, 'get_distribution', _mock_distribution)
+    monkeypatch.setattr(engine_mod, 'entry_points', _mock_entry_points)
+    monkeypatch.setattr(engine_mod, 'version', _mock_version)
+    engine_mod._get_package_version.cache_clear()
 
 
 @pytest.fixture
@@ -217,3 +218,123 @@ def test_repr(loaded_engine):
     Check that repr(PluginEngine(...)) is OK
     """
     assert repr(loaded_engine) == '<PluginEngine()>'
+
+
+def test_plugin_snapshots(mock_entry_point, engine):
+    """
+    Failed/active plugins are not copied on every call
+    """
+    engine.plugins_to_load = ['espresso', 'someotherstuff', 'imposter']
+    assert engine.get_failed_plugins() == frozenset()
+    assert len(engine.get_active_plugins()) == 0
+
+    engine.load_plugins()
+
+    failed = engine.get_failed_plugins()
+    active = engine.get_active_plugins()
+    assert failed == {'someotherstuff', 'imposter'}
+    assert list(failed) == ['someotherstuff', 'imposter']
+    assert list(active) == ['espresso']
+    assert engine.get_failed_plugins() is failed
+    assert engine.get_active_plugins() is active
+
+
+def test_plugin_docstring_subclass():
+    """
+    Subclasses do not inherit the cached title/description of their parent
+    """
+    class ParentPlugin(Plugin):
+        """Parent
+
+        Parent description
+        """
+
+    class ChildPlugin(ParentPlugin):
+        """Child"""
+
+    assert ParentPlugin(None).title == 'Parent'
+    assert ParentPlugin(None).description == 'Parent description'
+    assert ChildPlugin(None).title == 'Child'
+    assert ChildPlugin(None).description == 'no description available'
+
+
+def test_plugin_context():
+    """
+    The plugin context sets the current plugin and is left on errors
+    """
+    plugin = EspressoModule(None)
+    assert not current_plugin
+    with plugin.plugin_context():
+        assert current_plugin._get_current_object() is plugin
+    assert not current_plugin
+
+    with raises(ValueError):
+        with plugin.plugin_context():
+            raise ValueError
+    assert not current_plugin
+
+
+def test_connect_many():
+    """
+    Receivers connected by a plugin are called in its plugin context
+    """
+    signals = Namespace()
+    first = signals.signal('first')
+    second = signals.signal('second')
+    plugin = EspressoModule(None)
+    calls = []
+
+    def _receiver(sender):
+        calls.append((sender, current_plugin._get_current_object()))
+
+    plugin.connect_many([(first, _receiver, {}), (second, _receiver, {'sender': 'foo'})])
+    first.send('bar')
+    second.send('foo')
+    second.send('bar')
+    assert calls == [('bar', plugin), ('foo', plugin)]
+
+
+def test_connect_many_bound_method():
+    """
+    A bound method connected to several signals shares one wrapper
+    """
+    class HandlerPlugin(Plugin):
+        def handler(self, sender):
+            calls.append((sender, current_plugin._get_current_object()))
+
+    signals = Namespace()
+    first = signals.signal('first')
+    second = signals.signal('second')
+    plugin = HandlerPlugin(None)
+    calls = []
+
+    plugin.connect_many([(first, plugin.handler, {}), (second, plugin.handler, {})])
+    assert list(first.receivers.values()) == list(second.receivers.values())
+    first.send('foo')
+    second.send('bar')
+    assert calls == [('foo', plugin), ('bar', plugin)]
+
+
+def test_fail_noskip_stops_import(mock_entry_point, engine):
+    """
+    Stop importing plugins after the first failure if no_skip=False
+    """
+
+    engine.plugins_to_load = ['espresso', 'someotherstuff', 'imposter', 'otherversion']
+
+    assert engine.load_plugins(skip_failed=False) is False
+    assert list(engine.get_failed_plugins()) == ['someotherstuff']
+    assert len(engine.get_active_plugins()) == 0
+
+
+def test_duplicate_plugins_to_load(mock_entry_point, engine):
+    """
+    Plugins listed more than once are only loaded once
+    """
+    engine.plugins_to_load = ['otherversion', 'espresso', 'otherversion', 'espresso']
+    assert engine.plugins_to_load == ('otherversion', 'espresso')
+
+    engine.load_plugins()
+
+    assert len(engine.get_failed_plugins()) == 0
+    assert sorted(engine.get_active_plugins()) == ['espresso', 'otherversion']
@@ -0,0 +1,165 @@
+# This file is part of Flask-PluginEngine.
+# Copyright (C) 2014 CERN
+#
+# Flask-PluginEngine is free software; you can redistribute it
+# and/or modify it under the terms of the Revised BSD License.
+
+import os
+
+from blinker import Namespace
+from pytest import raises
+
+import pluginengine
+from pluginengine import Plugin, current_plugin, depends, uses
+from pluginengine.util import (get_root_path, resolve_dependencies, trim_docstring,
+                               wrap_in_plugin_context)
+
+
+def _make_plugin(name, requires=(), uses_=()):
+    cls = type(str(name), (Plugin,), {})
+    return uses(*uses_)(depends(*requires)(cls))
+
+
+def _order(plugins):
+    return [name for name, cls in resolve_dependencies(plugins)]
+
+
+def test_resolve_dependencies_order():
+    """
+    Plugins are always loaded after their hard and soft dependencies
+    """
+    plugins = {
+        'a': _make_plugin('a', requires=['b'], uses_=['c']),
+        'b': _make_plugin('b', requires=['d']),
+        'c': _make_plugin('c', uses_=['d']),
+        'd': _make_plugin('d'),
+    }
+    order = _order(plugins)
+    assert sorted(order) == ['a', 'b', 'c', 'd']
+    assert order.index('d') < order.index('b') < order.index('a')
+    assert order.index('d') < order.index('c') < order.index('a')
+
+
+def test_resolve_dependencies_soft_cycle():
+    """
+    Circular soft dependencies do not prevent plugins from being loaded
+    """
+    plugins = {
+        'a': _make_plugin('a', uses_=['b']),
+        'b': _make_plugin('b', uses_=['a']),
+        'c': _make_plugin('c', requires=['a', 'b']),
+    }
+    order = _order(plugins)
+    assert sorted(order) == ['a', 'b', 'c']
+    assert order[-1] == 'c'
+
+
+def test_resolve_dependencies_missing_soft():
+    """
+    Soft dependencies on unavailable plugins are ignored
+    """
+    plugins = {'a': _make_plugin('a', uses_=['missing'])}
+    assert _order(plugins) == ['a']
+
+
+def test_resolve_dependencies_missing_hard():
+    """
+    Fail if a hard dependency is not available
+    """
+    plugins = {'a': _make_plugin('a', requires=['missing'])}
+    with raises(Exception) as exc_info:
+        _order(plugins)
+    assert 'Could not resolve dependencies' in str(exc_info.value)
+
+
+def test_resolve_dependencies_hard_cycle():
+    """
+    Fail if there is a circular hard dependency
+    """
+    plugins = {
+        'a': _make_plugin('a', requires=['b']),
+        'b': _make_plugin('b', requires=['a']),
+    }
+    with raises(Exception) as exc_info:
+        _order(plugins)
+    assert 'Could not resolve dependencies' in str(exc_info.value)
+
+
+def test_wrap_in_plugin_context():
+    """
+    Wrapping the same function for the same plugin reuses the wrapper
+    """
+    plugin = _make_plugin('a')(None)
+    other = _make_plugin('b')(None)
+
+    def func(value):
+        return current_plugin._get_current_object(), value
+
+    wrapped = wrap_in_plugin_context(plugin, func)
+    assert wrap_in_plugin_context(plugin, func) is wrapped
+    assert wrap_in_plugin_context(other, func) is not wrapped
+    assert wrapped(42) == (plugin, 42)
+
+
+def test_wrap_in_plugin_context_bound_method():
+    """
+    Wrapping the same bound method for the same plugin reuses the wrapper
+    """
+    class HandlerPlugin(Plugin):
+        def handler(self, sender):
+            calls.append(sender)
+
+    calls = []
+    signal = Namespace().signal('test')
+    plugin = HandlerPlugin(None)
+
+    assert wrap_in_plugin_context(plugin, plugin.handler) is wrap_in_plugin_context(plugin, plugin.handler)
+    plugin.connect(signal, plugin.handler)
+    plugin.connect(signal, plugin.handler)
+    signal.send('foo')
+    assert calls == ['foo']
+
+
+def test_resolve_dependencies_no_deps():
+    """
+    Plugins without any dependencies are all loaded
+    """
+    plugins = {name: _make_plugin(name) for name in 'abc'}
+    assert sorted(_order(plugins)) == ['a', 'b', 'c']
+
+
+def test_trim_docstring():
+    """
+    Docstrings are trimmed according to PEP 257
+    """
+    assert trim_docstring(None) == ''
+    assert trim_docstring('') == ''
+    assert trim_docstring('\n\n') == ''
+    assert trim_docstring('Title') == 'Title'
+    assert trim_docstring('  Title  \n\n    Description\n      indented\n    ') == 'Title\n\nDescription\n  indented'
+    assert trim_docstring('\n    Title\n\n    Description\n\n') == 'Title\n\nDescription'
+    assert trim_docstring('Title\n\tTabbed') == 'Title\nTabbed'
+
+
+def test_get_root_path(monkeypatch, tmpdir):
+    """
+    The root path is the package folder or the folder containing the module
+    """
+    package_path = os.path.dirname(os.path.abspath(pluginengine.__file__))
+    assert get_root_path('pluginengine') == package_path
+    assert get_root_path('pluginengine.util') == package_path
+    assert get_root_path('email.mime.text') == os.path.join(os.path.dirname(os.__file__), 'email', 'mime')
+    assert get_root_path('pluginengine_does_not_exist') == os.getcwd()
+    monkeypatch.chdir(tmpdir)
+    assert get_root_path('pluginengine_does_not_exist') == str(tmpdir)
+    assert get_root_path('pluginengine') == package_path
+
+
+def test_get_root_path_module_appears(monkeypatch, tmpdir):
+    """
+    A module which cannot be found is looked up again on the next call
+    """
+    assert get_root_path('pluginengine_late_module') == os.getcwd()
+    tmpdir.join('pluginengine_late_module.py').write('')
+    monkeypatch.syspath_prepend(str(tmpdir))
+    assert get_root_path('pluginengine_late_module') == str(tmpdir)